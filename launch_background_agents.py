@@ -8,14 +8,19 @@ comprehensive health monitoring, and automated recovery.
 
 import asyncio
 import logging
+import logging.handlers
+import queue
+import re
 import signal
 import sys
 import time
 import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timezone
-import json
+
+import orjson
 
 # Import coordination system
 from background_agents.coordination.agent_coordinator import AgentCoordinator
@@ -30,6 +35,84 @@ from background_agents.monitoring.langsmith_bridge import LangSmithBridge
 from background_agents.ai_help.ai_help_agent import AIHelpAgent
 
 
+SYSTEM_VERSION = '1.0.0'
+
+# Agent identifiers, in startup/registration order
+HEARTBEAT_AGENT_ID = 'heartbeat_health_agent'
+PERFORMANCE_MONITOR_ID = 'performance_monitor'
+LANGSMITH_BRIDGE_ID = 'langsmith_bridge'
+AI_HELP_AGENT_ID = 'ai_help_agent'
+
+AGENT_IDS = (HEARTBEAT_AGENT_ID, PERFORMANCE_MONITOR_ID, LANGSMITH_BRIDGE_ID, AI_HELP_AGENT_ID)
+
+# (agent class, agent id, LauncherConfig field holding its work interval)
+AGENT_SPECS = (
+    (HeartbeatHealthAgent, HEARTBEAT_AGENT_ID, 'heartbeat_interval'),
+    (PerformanceMonitor, PERFORMANCE_MONITOR_ID, 'performance_interval'),
+    (LangSmithBridge, LANGSMITH_BRIDGE_ID, 'langsmith_interval'),
+    (AIHelpAgent, AI_HELP_AGENT_ID, 'ai_help_interval'),
+)
+
+# System event batching
+EVENT_BATCH_SIZE = 128
+EVENT_FLUSH_INTERVAL = 0.2
+
+# Seconds a PostgreSQL health check result is reused
+HEALTH_CHECK_CACHE_TTL = 5.0
+
+# KEY=value lines of a .env file, with optional single or double quotes
+ENV_LINE_PATTERN = re.compile(
+    r"""^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(?:"([^"]*)"|'([^']*)'|(.*?))[ \t\r]*$""",
+    re.MULTILINE
+    )
+
+# Severities that SharedState.log_system_event hands to its critical event
+# handling; these events are passed to it one by one instead of batched
+CRITICAL_SEVERITIES = frozenset(('ERROR', 'CRITICAL'))
+
+INSERT_SYSTEM_EVENT_SQL = """
+    INSERT INTO system_events (event_type, event_data, agent_id, timestamp, severity)
+    VALUES ($1, $2, $3, $4, $5)
+"""
+
+
+async def _none() -> None:
+    """Result for a status query whose component is not initialized"""
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class LauncherConfig:
+    """Launcher configuration, parsed once from the environment"""
+    
+    # Database configuration
+    db_host: str
+    db_port: int
+    db_name: str
+    db_user: str
+    db_password: str
+    db_min_size: int
+    db_max_size: int
+    db_command_timeout: float
+    
+    # Agent configuration
+    startup_delay: float
+    health_check_interval: int
+    recovery_attempts: int
+    recovery_delay: float
+    
+    # Monitoring configuration
+    heartbeat_interval: int
+    performance_interval: int
+    langsmith_interval: int
+    ai_help_interval: int
+    
+    # System configuration
+    graceful_shutdown_timeout: int
+    startup_timeout: int
+    health_check_timeout: int
+
+
 class BackgroundAgentsLauncher:
     """
     Enterprise Background Agents Launcher
@@ -56,14 +139,21 @@ class BackgroundAgentsLauncher:
         # System state
         self.is_running = False
         self.startup_time = None
+        self._startup_monotonic = None
         self.shutdown_event = asyncio.Event()
         
+        # Buffered system events, written in batches by the event flusher
+        self._event_queue = asyncio.Queue()
+        self._critical_events = []
+        self._event_flush_requested = asyncio.Event()
+        self._event_flush_task = None
+        
+        # Most recent (monotonic time, result) of the PostgreSQL health check
+        self._health_check_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        
         # Configuration
         self.config = self.load_configuration()
         
-        # Setup signal handlers
-        self.setup_signal_handlers()
-        
     def setup_logging(self) -> None:
         """Setup comprehensive logging for the launcher"""
         
@@ -71,72 +161,91 @@ class BackgroundAgentsLauncher:
         logs_dir = Path("logs")
         logs_dir.mkdir(exist_ok=True)
         
-        # Configure logging
-        log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        # Configure output handlers
+        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
         
+        file_handler = logging.FileHandler(logs_dir / "background_agents_launcher.log")
+        file_handler.setFormatter(formatter)
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(formatter)
+        
+        # Loggers only enqueue records; file and console writes happen on
+        # the listener thread so they never block the event loop
+        log_queue = queue.SimpleQueue()
+        self.log_listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+        self.log_listener.start()
+        
+        # The queue handler passes the bare message; the listener's handlers
+        # apply the full format
         logging.basicConfig(
             level=logging.INFO,
-            format=log_format,
-            handlers=[
-                logging.FileHandler(logs_dir / "background_agents_launcher.log"),
-                logging.StreamHandler(sys.stdout)
-            ]
+            format="%(message)s",
+            handlers=[logging.handlers.QueueHandler(log_queue)]
             )
         
         # Set specific log levels
         logging.getLogger("background_agents").setLevel(logging.INFO)
         logging.getLogger("postgresql").setLevel(logging.WARNING)
         
-    def load_configuration(self) -> Dict[str, Any]:
+    def load_configuration(self) -> "LauncherConfig":
         """Load system configuration"""
         
-        config = {
+        # POSTGRESQL_POOL_SIZE is still read by the adapter and system
+        # initializer; it sizes the pool unless MIN_SIZE/MAX_SIZE are set
+        pool_size = int(os.getenv('POSTGRESQL_POOL_SIZE', '10'))
+        
+        return LauncherConfig(
             # Database configuration
-            'database': {
-                'host': os.getenv('POSTGRESQL_HOST', 'localhost'),
-                'port': int(os.getenv('POSTGRESQL_PORT', '5432')),
-                'database': os.getenv('POSTGRESQL_DATABASE', 'background_agents'),
-                'user': os.getenv('POSTGRESQL_USER', 'postgres'),
-                'password': os.getenv('POSTGRESQL_PASSWORD', ''),
-                'pool_size': int(os.getenv('POSTGRESQL_POOL_SIZE', '10')),
-                'max_overflow': int(os.getenv('POSTGRESQL_MAX_OVERFLOW', '20'))
-            },
+            db_host=os.getenv('POSTGRESQL_HOST', 'localhost'),
+            db_port=int(os.getenv('POSTGRESQL_PORT', '5432')),
+            db_name=os.getenv('POSTGRESQL_DATABASE', 'background_agents'),
+            db_user=os.getenv('POSTGRESQL_USER', 'postgres'),
+            db_password=os.getenv('POSTGRESQL_PASSWORD', ''),
+            db_min_size=int(os.getenv('POSTGRESQL_MIN_SIZE', pool_size // 2)),
+            db_max_size=int(os.getenv('POSTGRESQL_MAX_SIZE', pool_size)),
+            db_command_timeout=float(os.getenv('POSTGRESQL_COMMAND_TIMEOUT', '60')),
             
             # Agent configuration
-            'agents': {
-                'startup_delay': float(os.getenv('AGENT_STARTUP_DELAY', '2.0')),
-                'health_check_interval': int(os.getenv('HEALTH_CHECK_INTERVAL', '30')),
-                'recovery_attempts': int(os.getenv('RECOVERY_ATTEMPTS', '3')),
-                'recovery_delay': float(os.getenv('RECOVERY_DELAY', '5.0'))
-            },
+            startup_delay=float(os.getenv('AGENT_STARTUP_DELAY', '2.0')),
+            health_check_interval=int(os.getenv('HEALTH_CHECK_INTERVAL', '30')),
+            recovery_attempts=int(os.getenv('RECOVERY_ATTEMPTS', '3')),
+            recovery_delay=float(os.getenv('RECOVERY_DELAY', '5.0')),
             
             # Monitoring configuration
-            'monitoring': {
-                'heartbeat_interval': int(os.getenv('HEARTBEAT_INTERVAL', '60')),
-                'performance_interval': int(os.getenv('PERFORMANCE_INTERVAL', '120')),
-                'langsmith_interval': int(os.getenv('LANGSMITH_INTERVAL', '300')),
-                'ai_help_interval': int(os.getenv('AI_HELP_INTERVAL', '30'))
-            },
+            heartbeat_interval=int(os.getenv('HEARTBEAT_INTERVAL', '60')),
+            performance_interval=int(os.getenv('PERFORMANCE_INTERVAL', '120')),
+            langsmith_interval=int(os.getenv('LANGSMITH_INTERVAL', '300')),
+            ai_help_interval=int(os.getenv('AI_HELP_INTERVAL', '30')),
             
             # System configuration
-            'system': {
-                'graceful_shutdown_timeout': int(os.getenv('SHUTDOWN_TIMEOUT', '30')),
-                'startup_timeout': int(os.getenv('STARTUP_TIMEOUT', '60')),
-                'health_check_timeout': int(os.getenv('HEALTH_CHECK_TIMEOUT', '10'))
-            }
-        }
-        
-        return config
+            graceful_shutdown_timeout=int(os.getenv('SHUTDOWN_TIMEOUT', '30')),
+            startup_timeout=int(os.getenv('STARTUP_TIMEOUT', '60')),
+            health_check_timeout=int(os.getenv('HEALTH_CHECK_TIMEOUT', '10'))
+            )
         
     def setup_signal_handlers(self) -> None:
-        """Setup signal handlers for graceful shutdown"""
+        """Setup signal handlers for graceful shutdown on the running event loop"""
         
-        def signal_handler(signum, frame):
-            self.logger.info(f"Received signal {signum}, initiating graceful shutdown...")
-            asyncio.create_task(self.shutdown())
-            
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        loop = asyncio.get_running_loop()
+        
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                # Signals are delivered through the loop's wakeup fd, so the
+                # callback runs as a regular loop callback (safe to log/schedule)
+                loop.add_signal_handler(signum, self.handle_shutdown_signal, signum)
+            except NotImplementedError:
+                # Windows event loops lack add_signal_handler; only hand the
+                # signal over to the loop thread from the raw handler
+                signal.signal(
+                    signum,
+                    lambda sig, frame: loop.call_soon_threadsafe(self.handle_shutdown_signal, sig)
+                    )
+                
+    def handle_shutdown_signal(self, signum: int) -> None:
+        """Wake start() for graceful shutdown in response to a signal (runs inside the event loop)"""
+        
+        self.logger.info("Received signal %s, initiating graceful shutdown...", signum)
+        self.shutdown_event.set()
         
     async def initialize_system(self) -> None:
         """Initialize the complete system infrastructure"""
@@ -144,24 +253,28 @@ class BackgroundAgentsLauncher:
         self.logger.info("Initializing background agents system...")
         
         try:
-            # Initialize PostgreSQL adapter
+            config = self.config
+            
+            # Initialize PostgreSQL adapter; its connection pool is the only one
+            # in the process and also carries the launcher's event writes
             self.logger.info("Initializing PostgreSQL adapter...")
             connection_config = ConnectionConfig(
-                host=self.config['database']['host'],
-                port=self.config['database']['port'],
-                database=self.config['database']['database'],
-                user=self.config['database']['user'],
-                password=self.config['database']['password'],
-                min_connections=self.config['database']['pool_size'] // 2,
-                max_connections=self.config['database']['pool_size']
+                host=config.db_host,
+                port=config.db_port,
+                database=config.db_name,
+                user=config.db_user,
+                password=config.db_password,
+                min_connections=config.db_min_size,
+                max_connections=config.db_max_size,
+                command_timeout=config.db_command_timeout
                 )
             
             self.postgresql_adapter = PostgreSQLAdapter(connection_config)
             await self.postgresql_adapter.initialize()
             
             # Verify database health
-            health_check = await self.postgresql_adapter.health_check()
-            if health_check['status'] != 'healthy':
+            health_check = await self.check_database_health()
+            if health_check.get('status') != 'healthy':
                 raise RuntimeError(f"PostgreSQL health check failed: {health_check}")
                 
             self.logger.info("PostgreSQL adapter initialized successfully")
@@ -187,7 +300,7 @@ class BackgroundAgentsLauncher:
             self.logger.info("System infrastructure initialization completed")
             
         except Exception as e:
-            self.logger.error(f"System initialization failed: {e}")
+            self.logger.error("System initialization failed: %s", e)
             raise
             
     async def create_agents(self) -> None:
@@ -196,46 +309,19 @@ class BackgroundAgentsLauncher:
         self.logger.info("Creating agent instances...")
         
         try:
-            # Create HeartbeatHealthAgent
-            self.logger.info("Creating HeartbeatHealthAgent...")
-            heartbeat_agent = HeartbeatHealthAgent(
-                agent_id="heartbeat_health_agent",
-                shared_state=self.shared_state
-                )
-            heartbeat_agent.work_interval = self.config['monitoring']['heartbeat_interval']
-            self.agents['heartbeat_health_agent'] = heartbeat_agent
-            
-            # Create PerformanceMonitor
-            self.logger.info("Creating PerformanceMonitor...")
-            performance_monitor = PerformanceMonitor(
-                agent_id="performance_monitor",
-                shared_state=self.shared_state
-                )
-            performance_monitor.work_interval = self.config['monitoring']['performance_interval']
-            self.agents['performance_monitor'] = performance_monitor
-            
-            # Create LangSmithBridge
-            self.logger.info("Creating LangSmithBridge...")
-            langsmith_bridge = LangSmithBridge(
-                agent_id="langsmith_bridge",
-                shared_state=self.shared_state
-                )
-            langsmith_bridge.work_interval = self.config['monitoring']['langsmith_interval']
-            self.agents['langsmith_bridge'] = langsmith_bridge
-            
-            # Create AIHelpAgent
-            self.logger.info("Creating AIHelpAgent...")
-            ai_help_agent = AIHelpAgent(
-                agent_id="ai_help_agent",
-                shared_state=self.shared_state
-                )
-            ai_help_agent.work_interval = self.config['monitoring']['ai_help_interval']
-            self.agents['ai_help_agent'] = ai_help_agent
-            
-            self.logger.info(f"Created {len(self.agents)} agent instances successfully")
+            for agent_class, agent_id, interval_setting in AGENT_SPECS:
+                self.logger.info("Creating %s...", agent_class.__name__)
+                agent = agent_class(
+                    agent_id=agent_id,
+                    shared_state=self.shared_state
+                    )
+                agent.work_interval = getattr(self.config, interval_setting)
+                self.agents[agent_id] = agent
+                
+            self.logger.info("Created %s agent instances successfully", len(self.agents))
             
         except Exception as e:
-            self.logger.error(f"Agent creation failed: {e}")
+            self.logger.error("Agent creation failed: %s", e)
             raise
             
     async def start_agents(self) -> None:
@@ -244,11 +330,25 @@ class BackgroundAgentsLauncher:
         self.logger.info("Starting background agents...")
         
         try:
-            # Register all agents with coordinator first
-            for agent_id in ['heartbeat_health_agent', 'performance_monitor', 'langsmith_bridge', 'ai_help_agent']:
-                if agent_id in self.agents:
-                    self.logger.info(f"Registering {agent_id} with coordinator...")
-                    await self.agent_coordinator.register_agent(self.agents[agent_id])
+            # Register all agents with coordinator first, concurrently
+            registrations = []
+            for agent_id in AGENT_IDS:
+                agent = self.agents.get(agent_id)
+                if agent is None:
+                    continue
+                    
+                self.logger.info("Registering %s with coordinator...", agent_id)
+                registrations.append(asyncio.create_task(self.agent_coordinator.register_agent(agent)))
+                    
+            # The first registration error aborts startup; cancel the others
+            # so none keep writing while startup unwinds
+            try:
+                await asyncio.gather(*registrations)
+            except BaseException:
+                for registration in registrations:
+                    registration.cancel()
+                await asyncio.gather(*registrations, return_exceptions=True)
+                raise
             
             # Use coordinator to start all agents (this uses our fixed startup logic)
             self.logger.info("Starting agents through coordinator...")
@@ -259,16 +359,16 @@ class BackgroundAgentsLauncher:
             failed_agents = [agent_id for agent_id, success in startup_results.items() if not success]
             
             if successful_agents:
-                self.logger.info(f"Successfully started agents: {', '.join(successful_agents)}")
+                self.logger.info("Successfully started agents: %s", ', '.join(successful_agents))
             
             if failed_agents:
-                self.logger.error(f"Failed to start agents: {', '.join(failed_agents)}")
+                self.logger.error("Failed to start agents: %s", ', '.join(failed_agents))
                 # Don't raise exception for partial failures - let the system run with available agents
             
-            self.logger.info(f"Agent startup completed: {len(successful_agents)}/{len(startup_results)} agents started successfully")
+            self.logger.info("Agent startup completed: %s/%s agents started successfully", len(successful_agents), len(startup_results))
             
         except Exception as e:
-            self.logger.error(f"Agent startup failed: {e}")
+            self.logger.error("Agent startup failed: %s", e)
             raise
             
     async def run_agent_with_recovery(self, agent_id: str) -> None:
@@ -276,55 +376,139 @@ class BackgroundAgentsLauncher:
         
         agent = self.agents[agent_id]
         recovery_attempts = 0
-        max_attempts = self.config['agents']['recovery_attempts']
+        max_attempts = self.config.recovery_attempts
         
-        self.logger.info(f"Starting recovery runner for agent {agent_id}")
+        self.logger.info("Starting recovery runner for agent %s", agent_id)
         
         while self.is_running and recovery_attempts <= max_attempts:
             try:
-                self.logger.info(f"Starting agent {agent_id} (attempt {recovery_attempts + 1})")
-                self.logger.debug(f"Agent {agent_id} runner state - is_running: {self.is_running}")
+                self.logger.info("Starting agent %s (attempt %s)", agent_id, recovery_attempts + 1)
+                self.logger.debug("Agent %s runner state - is_running: %s", agent_id, self.is_running)
                 
                 # Start the agent
-                self.logger.debug(f"Calling startup() for agent {agent_id}...")
+                self.logger.debug("Calling startup() for agent %s...", agent_id)
                 await agent.startup()
-                self.logger.warning(f"Agent {agent_id} startup() method completed - this indicates the agent's main loop exited")
+                self.logger.warning("Agent %s startup() method completed - this indicates the agent's main loop exited", agent_id)
                 
                 # Reset recovery attempts on successful start
                 recovery_attempts = 0
                 
                 # Agent startup() includes main loop, so if we reach here, agent has stopped
                 if self.is_running:
-                    self.logger.warning(f"Agent {agent_id} stopped unexpectedly while system is still running")
-                    self.logger.debug(f"Agent {agent_id} final state - is_running: {agent.is_running}, shutdown_requested: {getattr(agent, 'shutdown_requested', 'N/A')}")
+                    self.logger.warning("Agent %s stopped unexpectedly while system is still running", agent_id)
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(
+                            "Agent %s final state - is_running: %s, shutdown_requested: %s",
+                            agent_id, agent.is_running, getattr(agent, 'shutdown_requested', 'N/A')
+                            )
                 else:
-                    self.logger.info(f"Agent {agent_id} stopped because system is shutting down")
+                    self.logger.info("Agent %s stopped because system is shutting down", agent_id)
                     
             except Exception as e:
                 recovery_attempts += 1
-                self.logger.error(f"Agent {agent_id} failed (attempt {recovery_attempts}): {e}")
+                self.logger.error("Agent %s failed (attempt %s): %s", agent_id, recovery_attempts, e)
                 
                 if recovery_attempts <= max_attempts and self.is_running:
-                    self.logger.info(f"Attempting recovery for {agent_id} in {self.config['agents']['recovery_delay']} seconds...")
-                    await asyncio.sleep(self.config['agents']['recovery_delay'])
+                    self.logger.info("Attempting recovery for %s in %s seconds...", agent_id, self.config.recovery_delay)
+                    await asyncio.sleep(self.config.recovery_delay)
                     
                     # Notify coordinator of agent failure
                     try:
                         await self.agent_coordinator.handle_agent_failure(agent_id, str(e))
                     except Exception as coord_error:
-                        self.logger.error(f"Failed to notify coordinator of agent failure: {coord_error}")
+                        self.logger.error("Failed to notify coordinator of agent failure: %s", coord_error)
                 else:
-                    self.logger.error(f"Agent {agent_id} exceeded maximum recovery attempts")
+                    self.logger.error("Agent %s exceeded maximum recovery attempts", agent_id)
                     break
                     
-        self.logger.info(f"Agent {agent_id} runner exiting")
+        self.logger.info("Agent %s runner exiting", agent_id)
+        
+    def log_system_event(self, event_type: str, event_data: Dict[str, Any],
+                         severity: str = 'INFO', agent_id: Optional[str] = None) -> None:
+        """Queue a system event for the next batched write
+        
+        Batched payloads get the same system_timestamp/event_source fields
+        SharedState.log_system_event adds, and are encoded with orjson, which
+        serializes datetime values natively, so callers can pass them without
+        calling isoformat(). ERROR and CRITICAL events are handed to
+        SharedState.log_system_event by the flusher so they still go through
+        its critical event handling.
+        """
+        
+        if severity in CRITICAL_SEVERITIES:
+            self._critical_events.append((event_type, event_data, agent_id, severity))
+            self._event_flush_requested.set()
+            return
+            
+        now = datetime.now(timezone.utc)
+        payload = {**event_data, 'system_timestamp': now, 'event_source': 'shared_state'}
+        self._event_queue.put_nowait(
+            (event_type, orjson.dumps(payload).decode(), agent_id, now, severity)
+            )
+        
+        # Wake the flusher early once a full batch is waiting
+        if self._event_queue.qsize() >= EVENT_BATCH_SIZE:
+            self._event_flush_requested.set()
+            
+    async def write_pending_events(self) -> None:
+        """Write all queued system events in batches of EVENT_BATCH_SIZE"""
+        
+        # High-severity events go through SharedState, which logs its own errors
+        critical_events, self._critical_events = self._critical_events, []
+        for event in critical_events:
+            await self.shared_state.log_system_event(*event)
+            
+        if self._event_queue.empty():
+            return
+            
+        try:
+            # One connection for the whole drain; executemany goes through its
+            # statement cache, so the INSERT is parsed and planned once per
+            # pooled connection rather than on every flush
+            async with self.postgresql_adapter.get_connection() as conn:
+                while not self._event_queue.empty():
+                    batch = []
+                    while len(batch) < EVENT_BATCH_SIZE and not self._event_queue.empty():
+                        batch.append(self._event_queue.get_nowait())
+                        
+                    # A batch the database rejects is logged and dropped rather
+                    # than retried on every flush
+                    try:
+                        await conn.executemany(INSERT_SYSTEM_EVENT_SQL, batch)
+                    except Exception as e:
+                        self.logger.error("Failed to write %s system events: %s", len(batch), e)
+                        
+        except Exception as e:
+            # Nothing was dequeued; events stay queued for the next flush
+            self.logger.error("Failed to acquire connection for system events: %s", e)
+            
+    async def flush_events(self) -> None:
+        """Periodically drain queued system events into PostgreSQL"""
         
+        while True:
+            try:
+                await asyncio.wait_for(self._event_flush_requested.wait(), timeout=EVENT_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+                
+            self._event_flush_requested.clear()
+            
+            # Shielded so a batch in flight is not lost when the flusher is
+            # cancelled; the flusher waits for it before exiting so no write
+            # outlives the task or overlaps the final drain in shutdown()
+            write_task = asyncio.create_task(self.write_pending_events())
+            try:
+                await asyncio.shield(write_task)
+            except asyncio.CancelledError:
+                await write_task
+                raise
+            
     async def monitor_system_health(self) -> None:
         """Monitor overall system health"""
         
         self.logger.info("Starting system health monitoring...")
         
-        health_check_interval = self.config['agents']['health_check_interval']
+        health_check_interval = self.config.health_check_interval
         
         while self.is_running:
             try:
@@ -337,16 +521,16 @@ class BackgroundAgentsLauncher:
                 total_agents = health_data.get('total_agents', 0)
                 
                 self.logger.info(
-                    f"System Health: {health_score:.1f}/100, "
-                    f"Agents: {active_agents}/{total_agents} active"
+                    "System Health: %.1f/100, Agents: %s/%s active",
+                    health_score, active_agents, total_agents
                     )
                 
                 # Check for system issues
                 if health_score < 70:
-                    self.logger.warning(f"System health degraded: {health_score:.1f}/100")
+                    self.logger.warning("System health degraded: %.1f/100", health_score)
                     
                     # Log system health event
-                    await self.shared_state.log_system_event(
+                    self.log_system_event(
                         'system_health_check',
                         {
                             'health_score': health_score,
@@ -361,7 +545,7 @@ class BackgroundAgentsLauncher:
                 await asyncio.sleep(health_check_interval)
                 
             except Exception as e:
-                self.logger.error(f"System health monitoring error: {e}")
+                self.logger.error("System health monitoring error: %s", e)
                 await asyncio.sleep(health_check_interval)
                 
         self.logger.info("System health monitoring stopped")
@@ -371,8 +555,12 @@ class BackgroundAgentsLauncher:
         
         try:
             self.startup_time = datetime.now(timezone.utc)
+            self._startup_monotonic = time.monotonic()
             self.logger.info("Starting Background Agents System...")
             
+            # Route SIGINT/SIGTERM through the running loop
+            self.setup_signal_handlers()
+            
             # Initialize system infrastructure
             await self.initialize_system()
             
@@ -386,12 +574,12 @@ class BackgroundAgentsLauncher:
             self.is_running = True
             
             # Log successful startup
-            await self.shared_state.log_system_event(
+            self.log_system_event(
                 'system_startup',
                 {
-                    'startup_time': self.startup_time.isoformat(),
+                    'startup_time': self.startup_time,
                     'agents_started': len(self.agents),
-                    'system_version': '1.0.0'
+                    'system_version': SYSTEM_VERSION
                 },
                 severity='INFO'
                 )
@@ -401,28 +589,40 @@ class BackgroundAgentsLauncher:
                 'system_reliability',
                 'successful_startup',
                 1.0,
-                {'startup_duration': (datetime.now(timezone.utc) - self.startup_time).total_seconds()}
+                {'startup_duration': self.get_uptime()}
                 )
             
             self.logger.info("Background Agents System started successfully")
             
-            # Start system health monitoring
-            health_monitor_task = asyncio.create_task(self.monitor_system_health())
-            
-            # Wait for shutdown signal
-            await self.shutdown_event.wait()
-            
-            # Cancel health monitoring
-            health_monitor_task.cancel()
-            
+            # Background tasks live in a task group so none outlive start();
+            # startup work stays outside it so its errors are not wrapped in
+            # an ExceptionGroup
+            async with asyncio.TaskGroup() as task_group:
+                # Start batched system event writer
+                self._event_flush_task = task_group.create_task(self.flush_events())
+                
+                # Start system health monitoring
+                health_monitor_task = task_group.create_task(self.monitor_system_health())
+                
+                # Wait for shutdown signal
+                await self.shutdown_event.wait()
+                
+                # Stop background tasks; the task group joins them on exit, so
+                # start() only returns once nothing is left running
+                health_monitor_task.cancel()
+                self._event_flush_task.cancel()
+                
         except Exception as e:
-            self.logger.error(f"System startup failed: {e}")
+            self.logger.error("System startup failed: %s", e)
             raise
             
     async def shutdown(self) -> None:
         """Gracefully shutdown the system"""
         
         if not self.is_running:
+            # Startup may have failed after the adapter opened its pool
+            if self.postgresql_adapter:
+                await self.postgresql_adapter.close()
             return
             
         self.logger.info("Initiating graceful system shutdown...")
@@ -434,7 +634,7 @@ class BackgroundAgentsLauncher:
             
             # Log shutdown event
             if self.shared_state:
-                await self.shared_state.log_system_event(
+                self.log_system_event(
                     'system_shutdown_start',
                     {'shutdown_reason': 'graceful', 'uptime': self.get_uptime()},
                     severity='INFO'
@@ -445,24 +645,29 @@ class BackgroundAgentsLauncher:
             stop_tasks = []
             
             for agent_id, agent in self.agents.items():
-                self.logger.info(f"Stopping {agent_id}...")
+                self.logger.info("Stopping %s...", agent_id)
                 stop_task = asyncio.create_task(agent.shutdown())
                 stop_tasks.append(stop_task)
                 
             # Wait for agents to stop with timeout
-            try:
-                await asyncio.wait_for(
-                    asyncio.gather(*stop_tasks, return_exceptions=True),
-                    timeout=self.config['system']['graceful_shutdown_timeout']
+            if stop_tasks:
+                done, pending = await asyncio.wait(
+                    stop_tasks,
+                    timeout=self.config.graceful_shutdown_timeout
                     )
-                self.logger.info("All agents stopped successfully")
-            except asyncio.TimeoutError:
-                self.logger.warning("Agent shutdown timeout exceeded")
+                
+                if pending:
+                    self.logger.warning("Agent shutdown timeout exceeded")
+                    for stop_task in pending:
+                        stop_task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                else:
+                    self.logger.info("All agents stopped successfully")
                 
             # Cancel any remaining agent tasks
             for agent_id, task in self.agent_tasks.items():
                 if not task.done():
-                    self.logger.info(f"Cancelling task for {agent_id}")
+                    self.logger.info("Cancelling task for %s", agent_id)
                     task.cancel()
                     
             # Stop coordinator
@@ -475,7 +680,7 @@ class BackgroundAgentsLauncher:
                 self.logger.info("Closing shared state...")
                 
                 # Log final shutdown event
-                await self.shared_state.log_system_event(
+                self.log_system_event(
                     'system_shutdown_complete',
                     {
                         'shutdown_duration': time.time() - shutdown_start,
@@ -492,6 +697,13 @@ class BackgroundAgentsLauncher:
                     {'shutdown_duration': time.time() - shutdown_start}
                     )
                 
+                # Stop the event flusher and write any events still queued
+                # while the adapter's pool is still open
+                if self._event_flush_task:
+                    self._event_flush_task.cancel()
+                    await asyncio.gather(self._event_flush_task, return_exceptions=True)
+                await self.write_pending_events()
+                
                 await self.shared_state.close()
                 
             # Close PostgreSQL adapter
@@ -500,34 +712,47 @@ class BackgroundAgentsLauncher:
                 await self.postgresql_adapter.close()
                 
             shutdown_duration = time.time() - shutdown_start
-            self.logger.info(f"System shutdown completed in {shutdown_duration:.2f} seconds")
-            
-            # Signal shutdown complete
-            self.shutdown_event.set()
+            self.logger.info("System shutdown completed in %.2f seconds", shutdown_duration)
             
         except Exception as e:
-            self.logger.error(f"Error during shutdown: {e}")
+            self.logger.error("Error during shutdown: %s", e)
             raise
             
+    async def check_database_health(self) -> Dict[str, Any]:
+        """Get PostgreSQL health, reusing a result younger than HEALTH_CHECK_CACHE_TTL"""
+        
+        now = time.monotonic()
+        if self._health_check_cache and now - self._health_check_cache[0] < HEALTH_CHECK_CACHE_TTL:
+            return self._health_check_cache[1]
+            
+        health_check = await self.postgresql_adapter.health_check()
+        self._health_check_cache = (now, health_check)
+        return health_check
+        
     def get_uptime(self) -> float:
         """Get system uptime in seconds"""
-        if self.startup_time:
-            return (datetime.now(timezone.utc) - self.startup_time).total_seconds()
+        if self._startup_monotonic is not None:
+            return time.monotonic() - self._startup_monotonic
         return 0.0
         
     async def status(self) -> Dict[str, Any]:
         """Get comprehensive system status"""
         
         try:
+            # Run the independent database queries concurrently
+            health_check, system_health = await asyncio.gather(
+                self.check_database_health() if self.postgresql_adapter else _none(),
+                self.shared_state.get_system_health() if self.shared_state else _none()
+                )
+            
             status_data = {
                 'system_running': self.is_running,
                 'startup_time': self.startup_time.isoformat() if self.startup_time else None,
                 'uptime_seconds': self.get_uptime(),
                 'agents_configured': len(self.agents),
                 'agent_tasks_running': len([t for t in self.agent_tasks.values() if not t.done()]),
-                'postgresql_connected': bool(self.postgresql_adapter and 
-                                           (await self.postgresql_adapter.health_check())['status'] == 'healthy'),
-                'system_health': await self.shared_state.get_system_health() if self.shared_state else None
+                'postgresql_connected': bool(health_check and health_check.get('status') == 'healthy'),
+                'system_health': system_health
             }
             
             return status_data
@@ -540,23 +765,36 @@ class BackgroundAgentsLauncher:
             }
 
 
-async def main():
+def main():
     """Main entry point for the background agents launcher"""
     
     launcher = BackgroundAgentsLauncher()
     
+    # Use uvloop as the event loop implementation when available
     try:
-        # Start the system
-        await launcher.start()
-        
-    except KeyboardInterrupt:
-        launcher.logger.info("Received keyboard interrupt")
-    except Exception as e:
-        launcher.logger.error(f"System error: {e}")
-        sys.exit(1)
-    finally:
-        # Ensure clean shutdown
-        await launcher.shutdown()
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+        
+    # One loop for startup and shutdown: start() returns after the shutdown
+    # signal once its background tasks have joined, then shutdown() runs
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        try:
+            # Start the system
+            runner.run(launcher.start())
+            
+        except KeyboardInterrupt:
+            launcher.logger.info("Received keyboard interrupt")
+        except Exception as e:
+            launcher.logger.error("System error: %s", e)
+            sys.exit(1)
+        finally:
+            # Ensure clean shutdown
+            runner.run(launcher.shutdown())
+            
+            # Flush and stop the background log writer
+            launcher.log_listener.stop()
 
 
 if __name__ == "__main__":
@@ -573,13 +811,11 @@ if __name__ == "__main__":
             print("⚠️  python-dotenv not available, loading .env manually...")
             try:
                 with open(env_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            # Remove quotes if present
-                            value = value.strip().strip('"').strip("'")
-                            os.environ[key.strip()] = value
+                    env_data = f.read()
+                for match in ENV_LINE_PATTERN.finditer(env_data):
+                    # Quoted values come from groups 2/3, bare values from group 4
+                    value = match.group(2) or match.group(3) or match.group(4) or ''
+                    os.environ.setdefault(match.group(1), value)
                 print(f"✅ Manually loaded environment variables from {env_file}")
             except Exception as e:
                 print(f"⚠️  Could not load .env file: {e}")
@@ -589,4 +825,4 @@ if __name__ == "__main__":
         print("ℹ️  No .env file found, using system environment variables")
             
     # Run the main function
-    asyncio.run(main()) 
\ No newline at end of file
+    main() 
\ No newline at end of file
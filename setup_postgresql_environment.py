@@ -7,14 +7,298 @@ for the background agents system. Handles database creation, schema setup,
 environment configuration, and initial validation.
 """
 
+import argparse
+import asyncio
 import os
+import re
 import sys
 import subprocess
 import getpass
-import time
+from datetime import datetime, timezone
+from importlib.util import find_spec
 from pathlib import Path
 import shutil
 
+# Required packages as (pip distribution name, importable module name)
+_REQUIRED_PACKAGES = (
+    ('asyncpg', 'asyncpg'),
+    ('psycopg2-binary', 'psycopg2'),
+    ('python-dotenv', 'dotenv'),
+)
+
+# Working directories created by the setup
+_DIRECTORIES = ('logs', 'data', 'temp', 'backups', 'config')
+
+# Settings written to the environment file without prompting
+_DEFAULT_SETTINGS = {
+    'LANGSMITH_ENDPOINT': 'https://api.smith.langchain.com',
+    'LANGSMITH_PROJECT': 'background-agents-system',
+    'LANGSMITH_TRACING': 'true',
+    'OPENAI_MODEL': 'gpt-4',
+    'OPENAI_TEMPERATURE': '0.7',
+    'OPENAI_MAX_TOKENS': '2000',
+    'DEBUG': 'false',
+    'DATA_DIR': 'data',
+    'LOGS_DIR': 'logs',
+    'TEMP_DIR': 'temp',
+    'DEFAULT_HEARTBEAT_INTERVAL': '60',
+    'DEFAULT_MAX_RETRIES': '3',
+    'DEFAULT_TIMEOUT': '30',
+    'HEARTBEAT_HEALTH_AGENT_ENABLED': 'true',
+    'PERFORMANCE_MONITOR_ENABLED': 'true',
+    'LANGSMITH_BRIDGE_ENABLED': 'true',
+    'AI_HELP_AGENT_ENABLED': 'true',
+    'HEALTH_CHECK_INTERVAL': '30',
+    'HEARTBEAT_TIMEOUT': '120',
+    'PERFORMANCE_METRICS_INTERVAL': '60',
+    'ALERT_EMAIL_ENABLED': 'false',
+    'SECRET_KEY': 'your-secret-key-change-this-in-production',
+    'CORS_ENABLED': 'true',
+    'CORS_ORIGINS': 'http://localhost:3000,http://localhost:8501',
+    'BACKUP_ENABLED': 'true',
+    'BACKUP_INTERVAL': 'daily',
+    'BACKUP_RETENTION_DAYS': '30',
+    'BACKUP_LOCATION': 'backups'
+}
+
+# Defaults for the prompted settings, used when a --config file omits them
+_PROMPT_DEFAULTS = {
+    'POSTGRESQL_HOST': 'localhost',
+    'POSTGRESQL_PORT': '5432',
+    'POSTGRESQL_DATABASE': 'background_agents',
+    'POSTGRESQL_USER': 'postgres',
+    'POSTGRESQL_PASSWORD': '',
+    'POSTGRESQL_SSL_MODE': 'prefer',
+    'OPENAI_API_KEY': 'your-openai-api-key-here',
+    'LANGSMITH_API_KEY': 'your-langsmith-api-key-here',
+    'ENVIRONMENT': 'development',
+    'LOG_LEVEL': 'INFO',
+}
+
+# Tables created by the schema, checked during validation
+_TABLE_NAMES = (
+    'agents',
+    'agent_heartbeats',
+    'performance_metrics',
+    'system_state',
+    'system_events',
+    'help_requests',
+    'help_responses',
+    'agent_communications',
+    'llm_conversations',
+)
+
+# Settings for the schema transaction. Skipping the WAL flush wait on commit
+# is safe only because every statement is idempotent (IF NOT EXISTS /
+# ON CONFLICT DO NOTHING): if the commit is lost in a crash, re-running the
+# setup recreates it. Quieter notices hide "already exists, skipping".
+_SCHEMA_SESSION_SETTINGS = (
+    "SET LOCAL synchronous_commit = off",
+    "SET LOCAL client_min_messages = warning",
+)
+
+# Storage parameters for the append-heavy telemetry tables: leave room on each
+# page for HOT updates and vacuum/analyze well before the 20%/10% defaults
+_TELEMETRY_STORAGE = (
+    "WITH (fillfactor=90, autovacuum_vacuum_scale_factor=0.05, "
+    "autovacuum_analyze_scale_factor=0.02)"
+)
+
+# Tables, extensions and constraints of the background agents schema
+_SCHEMA_SQL = f'''
+-- Background Agents System PostgreSQL Schema
+-- Generated by setup script
+
+-- Enable UUID extension
+CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+
+-- 1. Agents table
+CREATE TABLE IF NOT EXISTS agents (
+    agent_id VARCHAR(255) PRIMARY KEY,
+    state VARCHAR(50) NOT NULL,
+    started_at TIMESTAMPTZ,
+    stopped_at TIMESTAMPTZ,
+    config JSONB,
+    metadata JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- 2. Agent heartbeats table
+CREATE TABLE IF NOT EXISTS agent_heartbeats (
+    id SERIAL PRIMARY KEY,
+    agent_id VARCHAR(255) NOT NULL,
+    timestamp TIMESTAMPTZ NOT NULL,
+    state VARCHAR(50),
+    error_count INTEGER DEFAULT 0,
+    metrics JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    FOREIGN KEY (agent_id) REFERENCES agents(agent_id) ON DELETE CASCADE
+) {_TELEMETRY_STORAGE};
+
+-- 3. Performance metrics table
+CREATE TABLE IF NOT EXISTS performance_metrics (
+    id SERIAL PRIMARY KEY,
+    agent_id VARCHAR(255) NOT NULL,
+    metric_name VARCHAR(255) NOT NULL,
+    value NUMERIC,
+    unit VARCHAR(50),
+    timestamp TIMESTAMPTZ DEFAULT NOW(),
+    metadata JSONB,
+    FOREIGN KEY (agent_id) REFERENCES agents(agent_id) ON DELETE CASCADE
+) {_TELEMETRY_STORAGE};
+
+-- 4. System state table
+CREATE TABLE IF NOT EXISTS system_state (
+    id SERIAL PRIMARY KEY,
+    key VARCHAR(255) UNIQUE NOT NULL,
+    value JSONB,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_by VARCHAR(255)
+);
+
+-- 5. System events table
+CREATE TABLE IF NOT EXISTS system_events (
+    id SERIAL PRIMARY KEY,
+    event_type VARCHAR(100) NOT NULL,
+    event_data JSONB,
+    agent_id VARCHAR(255),
+    timestamp TIMESTAMPTZ DEFAULT NOW(),
+    severity VARCHAR(20) DEFAULT 'INFO'
+) {_TELEMETRY_STORAGE};
+
+-- 6. Help requests table
+CREATE TABLE IF NOT EXISTS help_requests (
+    id SERIAL PRIMARY KEY,
+    request_id VARCHAR(255) UNIQUE NOT NULL,
+    user_id VARCHAR(255) NOT NULL,
+    content TEXT NOT NULL,
+    context JSONB,
+    status VARCHAR(50) DEFAULT 'pending',
+    priority VARCHAR(20) DEFAULT 'medium',
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- 7. Help responses table
+CREATE TABLE IF NOT EXISTS help_responses (
+    id SERIAL PRIMARY KEY,
+    request_id VARCHAR(255) NOT NULL,
+    response_id VARCHAR(255) UNIQUE NOT NULL,
+    content TEXT NOT NULL,
+    confidence_score NUMERIC,
+    sources JSONB,
+    generated_at TIMESTAMPTZ DEFAULT NOW(),
+    agent_id VARCHAR(255),
+    FOREIGN KEY (request_id) REFERENCES help_requests(request_id) ON DELETE CASCADE
+);
+
+-- 8. Agent communications table
+CREATE TABLE IF NOT EXISTS agent_communications (
+    id SERIAL PRIMARY KEY,
+    from_agent VARCHAR(255) NOT NULL,
+    to_agent VARCHAR(255) NOT NULL,
+    message_type VARCHAR(100) NOT NULL,
+    content JSONB,
+    timestamp TIMESTAMPTZ DEFAULT NOW(),
+    status VARCHAR(50) DEFAULT 'sent'
+);
+
+-- 9. LLM conversations table
+CREATE TABLE IF NOT EXISTS llm_conversations (
+    id SERIAL PRIMARY KEY,
+    conversation_id VARCHAR(255) NOT NULL,
+    agent_id VARCHAR(255),
+    prompt TEXT NOT NULL,
+    response TEXT,
+    model VARCHAR(100),
+    tokens_used INTEGER,
+    cost NUMERIC,
+    timestamp TIMESTAMPTZ DEFAULT NOW(),
+    metadata JSONB
+) {_TELEMETRY_STORAGE};
+'''
+
+# Individual schema statements, split once at import time
+_SCHEMA_STATEMENTS = tuple(stmt for stmt in map(str.strip, _SCHEMA_SQL.split(';')) if stmt)
+
+# The two largest telemetry tables, range-partitioned on timestamp when
+# ENABLE_PARTITIONING is set
+_PARTITIONED_TABLES = ('agent_heartbeats', 'performance_metrics')
+
+# A table created earlier without partitioning is kept by CREATE TABLE IF NOT
+# EXISTS, and PARTITION OF would fail on it, so the default partition is only
+# added to a partitioned parent
+_DEFAULT_PARTITION_SQL = '''
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'public.{table}'::regclass) THEN
+        CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT {storage};
+    ELSE
+        RAISE WARNING '{table} already exists without partitioning; skipping its default partition';
+    END IF;
+END $$'''
+
+def _partitioned_table_sql(stmt, table):
+    """Derive a range-partitioned variant of a telemetry CREATE TABLE statement.
+    
+    The primary key must include the partition key, and storage parameters
+    can only be set on the partitions, so they move to the default partition.
+    """
+    columns = stmt.removesuffix(f"\n) {_TELEMETRY_STORAGE}").replace("id SERIAL PRIMARY KEY", "id SERIAL")
+    return (
+        f"{columns},\n    PRIMARY KEY (id, timestamp)\n) PARTITION BY RANGE (timestamp);"
+        + _DEFAULT_PARTITION_SQL.format(table=table, storage=_TELEMETRY_STORAGE)
+    )
+
+_CREATE_TABLE_PATTERN = re.compile(r'CREATE TABLE IF NOT EXISTS (\w+)')
+
+# Schema statements with the partitioned tables swapped in
+_PARTITIONED_SCHEMA_STATEMENTS = tuple(
+    _partitioned_table_sql(stmt, match.group(1)) if match and match.group(1) in _PARTITIONED_TABLES else stmt
+    for stmt in _SCHEMA_STATEMENTS
+    for match in (_CREATE_TABLE_PATTERN.search(stmt),)
+)
+
+# (index name, DDL) pairs; only indexes missing from pg_indexes are created
+_INDEXES = (
+    ('idx_agents_state', "CREATE INDEX IF NOT EXISTS idx_agents_state ON agents(state)"),
+    ('idx_agents_started_at', "CREATE INDEX IF NOT EXISTS idx_agents_started_at ON agents(started_at)"),
+    ('idx_heartbeats_agent_timestamp', "CREATE INDEX IF NOT EXISTS idx_heartbeats_agent_timestamp ON agent_heartbeats(agent_id, timestamp DESC)"),
+    ('idx_heartbeats_timestamp', "CREATE INDEX IF NOT EXISTS idx_heartbeats_timestamp ON agent_heartbeats(timestamp DESC)"),
+    ('idx_metrics_agent_name_timestamp', "CREATE INDEX IF NOT EXISTS idx_metrics_agent_name_timestamp ON performance_metrics(agent_id, metric_name, timestamp DESC)"),
+    ('idx_metrics_timestamp', "CREATE INDEX IF NOT EXISTS idx_metrics_timestamp ON performance_metrics(timestamp DESC)"),
+    ('idx_system_state_key', "CREATE INDEX IF NOT EXISTS idx_system_state_key ON system_state(key)"),
+    ('idx_events_type_timestamp', "CREATE INDEX IF NOT EXISTS idx_events_type_timestamp ON system_events(event_type, timestamp DESC)"),
+    ('idx_events_agent_timestamp', "CREATE INDEX IF NOT EXISTS idx_events_agent_timestamp ON system_events(agent_id, timestamp DESC)"),
+    ('idx_events_severity', "CREATE INDEX IF NOT EXISTS idx_events_severity ON system_events(severity)"),
+    ('idx_help_requests_status', "CREATE INDEX IF NOT EXISTS idx_help_requests_status ON help_requests(status)"),
+    ('idx_help_requests_user_id', "CREATE INDEX IF NOT EXISTS idx_help_requests_user_id ON help_requests(user_id)"),
+    ('idx_help_requests_created_at', "CREATE INDEX IF NOT EXISTS idx_help_requests_created_at ON help_requests(created_at DESC)"),
+    ('idx_help_responses_request_id', "CREATE INDEX IF NOT EXISTS idx_help_responses_request_id ON help_responses(request_id)"),
+    ('idx_help_responses_confidence', "CREATE INDEX IF NOT EXISTS idx_help_responses_confidence ON help_responses(confidence_score DESC)"),
+    ('idx_communications_to_agent', "CREATE INDEX IF NOT EXISTS idx_communications_to_agent ON agent_communications(to_agent, timestamp DESC)"),
+    ('idx_communications_type', "CREATE INDEX IF NOT EXISTS idx_communications_type ON agent_communications(message_type)"),
+    ('idx_llm_conversations_agent', "CREATE INDEX IF NOT EXISTS idx_llm_conversations_agent ON llm_conversations(agent_id, timestamp DESC)"),
+    ('idx_llm_conversations_model', "CREATE INDEX IF NOT EXISTS idx_llm_conversations_model ON llm_conversations(model, timestamp DESC)"),
+)
+
+_EXISTING_INDEXES_SQL = "SELECT indexname FROM pg_indexes WHERE schemaname = 'public'"
+
+# Initial system state rows are supplied as (key, Json value, updated_by)
+_INITIAL_STATE_SQL = (
+    "INSERT INTO system_state (key, value, updated_by) VALUES %s "
+    "ON CONFLICT (key) DO NOTHING"
+)
+
+# Expected tables that exist, via direct to_regclass lookups rather than the
+# information_schema views
+_VERIFY_TABLES_SQL = (
+    "SELECT t FROM unnest(ARRAY[%s]::text[]) WITH ORDINALITY AS tables(t, n) "
+    "WHERE to_regclass('public.' || t) IS NOT NULL ORDER BY n"
+    % ", ".join(f"'{table}'" for table in _TABLE_NAMES)
+)
+
 class PostgreSQLEnvironmentSetup:
     """
     Comprehensive PostgreSQL environment setup.
@@ -28,10 +312,19 @@ class PostgreSQLEnvironmentSetup:
     - Validation and verification
     """
     
-    def __init__(self):
+    # CREATE DATABASE cannot run inside a transaction block or function, so
+    # the existence check stays a separate statement rather than a DO block
+    DATABASE_EXISTS_SQL = "SELECT 1 FROM pg_database WHERE datname = %s"
+    CREATE_DATABASE_SQL = "CREATE DATABASE {}"
+    
+    def __init__(self, config_file=None):
         """Initialize the setup script."""
         self.config = {}
+        self.config_file = config_file
         self.env_file_path = ".env"
+        self._base_dsn = {}
+        self._conns = {}
+        self.pool = None
         
     def print_banner(self):
         """Print setup banner."""
@@ -49,8 +342,8 @@ class PostgreSQLEnvironmentSetup:
         print("Checking prerequisites...")
         
         # Check Python version
-        if sys.version_info < (3, 8):
-            print(f"❌ Python 3.8+ required, found {sys.version}")
+        if sys.version_info < (3, 11):
+            print(f"❌ Python 3.11+ required, found {sys.version}")
             return False
         print("✅ Python version check passed")
         
@@ -61,15 +354,9 @@ class PostgreSQLEnvironmentSetup:
         else:
             print("✅ PostgreSQL client tools found")
         
-        # Check for required Python packages
-        required_packages = ['asyncpg', 'psycopg2-binary', 'python-dotenv']
-        missing_packages = []
-        
-        for package in required_packages:
-            try:
-                __import__(package.replace('-', '_'))
-            except ImportError:
-                missing_packages.append(package)
+        # Check for required Python packages; find_spec locates the module
+        # without importing it
+        missing_packages = [package for package, module in _REQUIRED_PACKAGES if find_spec(module) is None]
         
         if missing_packages:
             print(f"❌ Missing required packages: {missing_packages}")
@@ -114,25 +401,81 @@ class PostgreSQLEnvironmentSetup:
         default_ssl = "prefer"
         ssl_mode = input(f"SSL mode [{default_ssl}]: ").strip()
         self.config['POSTGRESQL_SSL_MODE'] = ssl_mode or default_ssl
+        
+        self._build_base_dsn()
+    
+    def load_config_file(self):
+        """Load configuration from a .env-format file instead of prompting."""
+        print(f"\nLoading configuration from {self.config_file}")
+        
+        if not Path(self.config_file).is_file():
+            print(f"❌ Configuration file not found: {self.config_file}")
+            return False
+        
+        from dotenv import dotenv_values
+        values = dotenv_values(self.config_file)
+        
+        self.config.update(_PROMPT_DEFAULTS)
+        self.config.update(_DEFAULT_SETTINGS)
+        self.config.update({key: value for key, value in values.items() if value is not None})
+        
+        self._build_base_dsn()
+        print(f"✅ Loaded {len(values)} settings")
+        return True
+    
+    def _build_base_dsn(self):
+        """Cache the connection parameters shared by every database connection."""
+        self._base_dsn = {
+            'host': self.config['POSTGRESQL_HOST'],
+            'port': int(self.config['POSTGRESQL_PORT']),
+            'user': self.config['POSTGRESQL_USER'],
+            'password': self.config['POSTGRESQL_PASSWORD'],
+            'sslmode': self.config['POSTGRESQL_SSL_MODE'],
+        }
+    
+    def _get_admin_conn(self, dbname, autocommit=False):
+        """Get a cached connection to the given database, opening it on first use."""
+        conn = self._conns.get(dbname)
+        if conn is not None and conn.closed == 0:
+            return conn
+        
+        import psycopg2
+        
+        conn = psycopg2.connect(**self._base_dsn, dbname=dbname)
+        conn.autocommit = autocommit
+        self._conns[dbname] = conn
+        return conn
+    
+    def _close_conns(self):
+        """Close all cached database connections."""
+        for conn in self._conns.values():
+            if conn.closed == 0:
+                conn.close()
+        self._conns.clear()
+    
+    def _open_pool(self):
+        """Pool connections to the new database for post-setup validation."""
+        if self.pool is None:
+            from psycopg2 import pool
+            self.pool = pool.SimpleConnectionPool(
+                1, 5, **self._base_dsn, dbname=self.config['POSTGRESQL_DATABASE']
+            )
+        return self.pool
+    
+    def _close_pool(self):
+        """Close the validation connection pool."""
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
     
     def test_database_connection(self):
         """Test database connection."""
         print("\nTesting database connection...")
         
         try:
-            import psycopg2
-            
-            conn_string = (
-                f"host={self.config['POSTGRESQL_HOST']} "
-                f"port={self.config['POSTGRESQL_PORT']} "
-                f"user={self.config['POSTGRESQL_USER']} "
-                f"password={self.config['POSTGRESQL_PASSWORD']} "
-                f"sslmode={self.config['POSTGRESQL_SSL_MODE']}"
-            )
-            
-            # Test connection to default database first
-            test_conn = psycopg2.connect(conn_string + " dbname=postgres")
-            test_conn.close()
+            # Test connection to default database first; the connection is
+            # kept open and reused by create_database
+            self._get_admin_conn('postgres', autocommit=True)
             print("✅ Connection to PostgreSQL server successful")
             
             return True
@@ -146,38 +489,24 @@ class PostgreSQLEnvironmentSetup:
         print(f"\nCreating database '{self.config['POSTGRESQL_DATABASE']}'...")
         
         try:
-            import psycopg2
-            from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-            
-            # Connect to default database
-            conn_string = (
-                f"host={self.config['POSTGRESQL_HOST']} "
-                f"port={self.config['POSTGRESQL_PORT']} "
-                f"user={self.config['POSTGRESQL_USER']} "
-                f"password={self.config['POSTGRESQL_PASSWORD']} "
-                f"sslmode={self.config['POSTGRESQL_SSL_MODE']} "
-                f"dbname=postgres"
-            )
-            
-            conn = psycopg2.connect(conn_string)
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            # Connect to default database (autocommit, required for CREATE DATABASE)
+            conn = self._get_admin_conn('postgres', autocommit=True)
             cursor = conn.cursor()
             
             # Check if database exists
-            cursor.execute(
-                "SELECT 1 FROM pg_database WHERE datname = %s",
-                (self.config['POSTGRESQL_DATABASE'],)
-            )
+            cursor.execute(self.DATABASE_EXISTS_SQL, (self.config['POSTGRESQL_DATABASE'],))
             
             if cursor.fetchone():
                 print(f"✅ Database '{self.config['POSTGRESQL_DATABASE']}' already exists")
             else:
-                # Create database
-                cursor.execute(f'CREATE DATABASE "{self.config["POSTGRESQL_DATABASE"]}"')
+                # Create database, quoting the name as an identifier
+                from psycopg2 import sql
+                cursor.execute(
+                    sql.SQL(self.CREATE_DATABASE_SQL).format(sql.Identifier(self.config['POSTGRESQL_DATABASE']))
+                )
                 print(f"✅ Database '{self.config['POSTGRESQL_DATABASE']}' created successfully")
             
             cursor.close()
-            conn.close()
             
             return True
             
@@ -189,189 +518,46 @@ class PostgreSQLEnvironmentSetup:
         """Create database schema."""
         print("\nCreating database schema...")
         
-        schema_sql = '''
--- Background Agents System PostgreSQL Schema
--- Generated by setup script
-
--- Enable UUID extension
-CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
-
--- 1. Agents table
-CREATE TABLE IF NOT EXISTS agents (
-    agent_id VARCHAR(255) PRIMARY KEY,
-    state VARCHAR(50) NOT NULL,
-    started_at TIMESTAMPTZ,
-    stopped_at TIMESTAMPTZ,
-    config JSONB,
-    metadata JSONB,
-    created_at TIMESTAMPTZ DEFAULT NOW(),
-    updated_at TIMESTAMPTZ DEFAULT NOW()
-);
-
-CREATE INDEX IF NOT EXISTS idx_agents_state ON agents(state);
-CREATE INDEX IF NOT EXISTS idx_agents_started_at ON agents(started_at);
-
--- 2. Agent heartbeats table
-CREATE TABLE IF NOT EXISTS agent_heartbeats (
-    id SERIAL PRIMARY KEY,
-    agent_id VARCHAR(255) NOT NULL,
-    timestamp TIMESTAMPTZ NOT NULL,
-    state VARCHAR(50),
-    error_count INTEGER DEFAULT 0,
-    metrics JSONB,
-    created_at TIMESTAMPTZ DEFAULT NOW(),
-    FOREIGN KEY (agent_id) REFERENCES agents(agent_id) ON DELETE CASCADE
-);
-
-CREATE INDEX IF NOT EXISTS idx_heartbeats_agent_timestamp ON agent_heartbeats(agent_id, timestamp DESC);
-CREATE INDEX IF NOT EXISTS idx_heartbeats_timestamp ON agent_heartbeats(timestamp DESC);
-
--- 3. Performance metrics table
-CREATE TABLE IF NOT EXISTS performance_metrics (
-    id SERIAL PRIMARY KEY,
-    agent_id VARCHAR(255) NOT NULL,
-    metric_name VARCHAR(255) NOT NULL,
-    value NUMERIC,
-    unit VARCHAR(50),
-    timestamp TIMESTAMPTZ DEFAULT NOW(),
-    metadata JSONB,
-    FOREIGN KEY (agent_id) REFERENCES agents(agent_id) ON DELETE CASCADE
-);
-
-CREATE INDEX IF NOT EXISTS idx_metrics_agent_name_timestamp ON performance_metrics(agent_id, metric_name, timestamp DESC);
-CREATE INDEX IF NOT EXISTS idx_metrics_timestamp ON performance_metrics(timestamp DESC);
-
--- 4. System state table
-CREATE TABLE IF NOT EXISTS system_state (
-    id SERIAL PRIMARY KEY,
-    key VARCHAR(255) UNIQUE NOT NULL,
-    value JSONB,
-    updated_at TIMESTAMPTZ DEFAULT NOW(),
-    updated_by VARCHAR(255)
-);
-
-CREATE INDEX IF NOT EXISTS idx_system_state_key ON system_state(key);
-
--- 5. System events table
-CREATE TABLE IF NOT EXISTS system_events (
-    id SERIAL PRIMARY KEY,
-    event_type VARCHAR(100) NOT NULL,
-    event_data JSONB,
-    agent_id VARCHAR(255),
-    timestamp TIMESTAMPTZ DEFAULT NOW(),
-    severity VARCHAR(20) DEFAULT 'INFO'
-);
-
-CREATE INDEX IF NOT EXISTS idx_events_type_timestamp ON system_events(event_type, timestamp DESC);
-CREATE INDEX IF NOT EXISTS idx_events_agent_timestamp ON system_events(agent_id, timestamp DESC);
-CREATE INDEX IF NOT EXISTS idx_events_severity ON system_events(severity);
-
--- 6. Help requests table
-CREATE TABLE IF NOT EXISTS help_requests (
-    id SERIAL PRIMARY KEY,
-    request_id VARCHAR(255) UNIQUE NOT NULL,
-    user_id VARCHAR(255) NOT NULL,
-    content TEXT NOT NULL,
-    context JSONB,
-    status VARCHAR(50) DEFAULT 'pending',
-    priority VARCHAR(20) DEFAULT 'medium',
-    created_at TIMESTAMPTZ DEFAULT NOW(),
-    updated_at TIMESTAMPTZ DEFAULT NOW()
-);
-
-CREATE INDEX IF NOT EXISTS idx_help_requests_status ON help_requests(status);
-CREATE INDEX IF NOT EXISTS idx_help_requests_user_id ON help_requests(user_id);
-CREATE INDEX IF NOT EXISTS idx_help_requests_created_at ON help_requests(created_at DESC);
-
--- 7. Help responses table
-CREATE TABLE IF NOT EXISTS help_responses (
-    id SERIAL PRIMARY KEY,
-    request_id VARCHAR(255) NOT NULL,
-    response_id VARCHAR(255) UNIQUE NOT NULL,
-    content TEXT NOT NULL,
-    confidence_score NUMERIC,
-    sources JSONB,
-    generated_at TIMESTAMPTZ DEFAULT NOW(),
-    agent_id VARCHAR(255),
-    FOREIGN KEY (request_id) REFERENCES help_requests(request_id) ON DELETE CASCADE
-);
-
-CREATE INDEX IF NOT EXISTS idx_help_responses_request_id ON help_responses(request_id);
-CREATE INDEX IF NOT EXISTS idx_help_responses_confidence ON help_responses(confidence_score DESC);
-
--- 8. Agent communications table
-CREATE TABLE IF NOT EXISTS agent_communications (
-    id SERIAL PRIMARY KEY,
-    from_agent VARCHAR(255) NOT NULL,
-    to_agent VARCHAR(255) NOT NULL,
-    message_type VARCHAR(100) NOT NULL,
-    content JSONB,
-    timestamp TIMESTAMPTZ DEFAULT NOW(),
-    status VARCHAR(50) DEFAULT 'sent'
-);
-
-CREATE INDEX IF NOT EXISTS idx_communications_to_agent ON agent_communications(to_agent, timestamp DESC);
-CREATE INDEX IF NOT EXISTS idx_communications_type ON agent_communications(message_type);
-
--- 9. LLM conversations table
-CREATE TABLE IF NOT EXISTS llm_conversations (
-    id SERIAL PRIMARY KEY,
-    conversation_id VARCHAR(255) NOT NULL,
-    agent_id VARCHAR(255),
-    prompt TEXT NOT NULL,
-    response TEXT,
-    model VARCHAR(100),
-    tokens_used INTEGER,
-    cost NUMERIC,
-    timestamp TIMESTAMPTZ DEFAULT NOW(),
-    metadata JSONB
-);
-
-CREATE INDEX IF NOT EXISTS idx_llm_conversations_agent ON llm_conversations(agent_id, timestamp DESC);
-CREATE INDEX IF NOT EXISTS idx_llm_conversations_model ON llm_conversations(model, timestamp DESC);
-
--- Insert initial system state
-INSERT INTO system_state (key, value, updated_by) 
-VALUES 
-    ('system_initialized', 'true', 'setup_script'),
-    ('schema_version', '1.0.0', 'setup_script'),
-    ('setup_timestamp', to_jsonb(NOW()), 'setup_script')
-ON CONFLICT (key) DO NOTHING;
-'''
-        
         try:
-            import psycopg2
-            
-            conn_string = (
-                f"host={self.config['POSTGRESQL_HOST']} "
-                f"port={self.config['POSTGRESQL_PORT']} "
-                f"user={self.config['POSTGRESQL_USER']} "
-                f"password={self.config['POSTGRESQL_PASSWORD']} "
-                f"sslmode={self.config['POSTGRESQL_SSL_MODE']} "
-                f"dbname={self.config['POSTGRESQL_DATABASE']}"
-            )
-            
-            conn = psycopg2.connect(conn_string)
+            conn = self._get_admin_conn(self.config['POSTGRESQL_DATABASE'])
             cursor = conn.cursor()
             
-            # Execute schema creation
-            cursor.execute(schema_sql)
-            conn.commit()
+            partitioning = str(self.config.get('ENABLE_PARTITIONING', 'false')).lower() == 'true'
+            schema_statements = _PARTITIONED_SCHEMA_STATEMENTS if partitioning else _SCHEMA_STATEMENTS
             
-            print("✅ Database schema created successfully")
+            # Create tables and list existing indexes in a single round trip;
+            # the result set is that of the final SELECT
+            cursor.execute(";\n".join(
+                _SCHEMA_SESSION_SETTINGS + schema_statements + (_EXISTING_INDEXES_SQL,)
+            ))
+            existing_indexes = {row[0] for row in cursor.fetchall()}
             
-            # Verify tables were created
-            cursor.execute("""
-                SELECT table_name FROM information_schema.tables 
-                WHERE table_schema = 'public'
-                ORDER BY table_name
-            """)
+            # Surface warnings raised by the schema batch, e.g. a default
+            # partition skipped because its parent table is not partitioned
+            for notice in conn.notices:
+                print(f"⚠️  {notice.strip()}")
+            del conn.notices[:]
             
+            # Insert initial system state in one multi-row statement; values
+            # are serialized client-side so the server stores them as-is
+            from psycopg2.extras import Json, execute_values
+            initial_state = [
+                ('system_initialized', Json(True), 'setup_script'),
+                ('schema_version', Json('1.0.0'), 'setup_script'),
+                ('setup_timestamp', Json(datetime.now(timezone.utc).isoformat()), 'setup_script'),
+            ]
+            execute_values(cursor, _INITIAL_STATE_SQL, initial_state)
+            
+            # Create missing indexes and verify tables in a single round trip
+            missing_indexes = tuple(sql for name, sql in _INDEXES if name not in existing_indexes)
+            cursor.execute(";\n".join(missing_indexes + (_VERIFY_TABLES_SQL,)))
             tables = [row[0] for row in cursor.fetchall()]
+            conn.commit()
+            
+            print("✅ Database schema created successfully")
             print(f"✅ Created {len(tables)} tables: {', '.join(tables)}")
             
             cursor.close()
-            conn.close()
             
             return True
             
@@ -402,62 +588,33 @@ ON CONFLICT (key) DO NOTHING;
         self.config['LOG_LEVEL'] = log_level or 'INFO'
         
         # Additional settings with defaults
-        self.config.update({
-            'LANGSMITH_ENDPOINT': 'https://api.smith.langchain.com',
-            'LANGSMITH_PROJECT': 'background-agents-system',
-            'LANGSMITH_TRACING': 'true',
-            'OPENAI_MODEL': 'gpt-4',
-            'OPENAI_TEMPERATURE': '0.7',
-            'OPENAI_MAX_TOKENS': '2000',
-            'DEBUG': 'false',
-            'DATA_DIR': 'data',
-            'LOGS_DIR': 'logs',
-            'TEMP_DIR': 'temp',
-            'DEFAULT_HEARTBEAT_INTERVAL': '60',
-            'DEFAULT_MAX_RETRIES': '3',
-            'DEFAULT_TIMEOUT': '30',
-            'HEARTBEAT_HEALTH_AGENT_ENABLED': 'true',
-            'PERFORMANCE_MONITOR_ENABLED': 'true',
-            'LANGSMITH_BRIDGE_ENABLED': 'true',
-            'AI_HELP_AGENT_ENABLED': 'true',
-            'HEALTH_CHECK_INTERVAL': '30',
-            'HEARTBEAT_TIMEOUT': '120',
-            'PERFORMANCE_METRICS_INTERVAL': '60',
-            'ALERT_EMAIL_ENABLED': 'false',
-            'SECRET_KEY': 'your-secret-key-change-this-in-production',
-            'CORS_ENABLED': 'true',
-            'CORS_ORIGINS': 'http://localhost:3000,http://localhost:8501',
-            'BACKUP_ENABLED': 'true',
-            'BACKUP_INTERVAL': 'daily',
-            'BACKUP_RETENTION_DAYS': '30',
-            'BACKUP_LOCATION': 'backups'
-        })
+        self.config.update(_DEFAULT_SETTINGS)
     
     def create_environment_file(self):
         """Create .env file with configuration."""
         print(f"\nCreating environment file: {self.env_file_path}")
         
+        db_vars = ['POSTGRESQL_HOST', 'POSTGRESQL_PORT', 'POSTGRESQL_DATABASE', 'POSTGRESQL_USER', 'POSTGRESQL_PASSWORD', 'POSTGRESQL_SSL_MODE']
+        api_vars = ['OPENAI_API_KEY', 'LANGSMITH_API_KEY']
+        grouped_vars = frozenset(db_vars + api_vars)
+        
+        lines = [
+            "# Background Agents System Environment Configuration",
+            "# Generated by setup script",
+            f"# Created: {datetime.now(timezone.utc).isoformat(timespec='seconds')}",
+            "",
+            "# Database Configuration",
+        ]
+        lines += [f"{var}={self.config[var]}" for var in db_vars]
+        
+        lines += ["", "# API Keys"]
+        lines += [f"{var}={self.config[var]}" for var in api_vars]
+        
+        lines += ["", "# System Settings"]
+        lines += [f"{key}={value}" for key, value in self.config.items() if key not in grouped_vars]
+        
         try:
-            with open(self.env_file_path, 'w') as f:
-                f.write("# Background Agents System Environment Configuration\n")
-                f.write("# Generated by setup script\n")
-                f.write(f"# Created: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                
-                # Database configuration
-                f.write("# Database Configuration\n")
-                db_vars = ['POSTGRESQL_HOST', 'POSTGRESQL_PORT', 'POSTGRESQL_DATABASE', 'POSTGRESQL_USER', 'POSTGRESQL_PASSWORD', 'POSTGRESQL_SSL_MODE']
-                for var in db_vars:
-                    f.write(f"{var}={self.config[var]}\n")
-                
-                f.write("\n# API Keys\n")
-                api_vars = ['OPENAI_API_KEY', 'LANGSMITH_API_KEY']
-                for var in api_vars:
-                    f.write(f"{var}={self.config[var]}\n")
-                
-                f.write("\n# System Settings\n")
-                for key, value in self.config.items():
-                    if key not in db_vars + api_vars:
-                        f.write(f"{key}={value}\n")
+            Path(self.env_file_path).write_text("\n".join(lines) + "\n", encoding='utf-8')
             
             print(f"✅ Environment file created: {self.env_file_path}")
             return True
@@ -470,22 +627,92 @@ ON CONFLICT (key) DO NOTHING;
         """Create necessary directories."""
         print("\nCreating directories...")
         
-        directories = ['logs', 'data', 'temp', 'backups', 'config']
+        try:
+            for directory in _DIRECTORIES:
+                os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            print(f"❌ Failed to create directory {directory}: {e}")
+            return False
         
-        for directory in directories:
-            try:
-                Path(directory).mkdir(exist_ok=True)
-                print(f"✅ Created directory: {directory}")
-            except Exception as e:
-                print(f"❌ Failed to create directory {directory}: {e}")
-                return False
+        print(f"✅ Created directories: {', '.join(_DIRECTORIES)}")
+        return True
+    
+    def validate_schema(self):
+        """Validate the created schema in-process using a pooled connection."""
+        conn = self.pool.getconn()
         
+        try:
+            cursor = conn.cursor()
+            cursor.execute(_VERIFY_TABLES_SQL)
+            found_tables = {row[0] for row in cursor.fetchall()}
+            
+            cursor.execute("SELECT 1 FROM system_state WHERE key = 'system_initialized'")
+            initialized = cursor.fetchone() is not None
+            cursor.close()
+        finally:
+            # End the read-only transaction before handing the connection back
+            conn.rollback()
+            self.pool.putconn(conn)
+        
+        missing_tables = [table for table in _TABLE_NAMES if table not in found_tables]
+        if missing_tables:
+            print(f"❌ Missing tables: {', '.join(missing_tables)}")
+            return False
+        if not initialized:
+            print("❌ Initial system state not found")
+            return False
+        
+        print(f"✅ Schema validated: {len(found_tables)} tables and initial system state present")
         return True
     
     def run_validation_test(self):
         """Run validation test."""
         print("\nRunning validation test...")
         
+        # Check the schema in-process before running the migration test suite
+        try:
+            self._open_pool()
+        except Exception as e:
+            print(f"❌ Could not connect to the database for schema validation: {e}")
+            return False
+        
+        try:
+            if not self.validate_schema():
+                return False
+        except Exception as e:
+            print(f"❌ Schema validation failed: {e}")
+            return False
+        
+        if find_spec('test_postgresql_migration') is None:
+            print("⚠️  test_postgresql_migration.py not found, skipping validation")
+            return True
+        
+        try:
+            # Run the migration test in-process, reusing the database drivers
+            # already loaded here instead of starting a new interpreter
+            import test_postgresql_migration
+        except ImportError:
+            return self._run_validation_subprocess()
+        
+        try:
+            result = test_postgresql_migration.main()
+            if asyncio.iscoroutine(result):
+                result = asyncio.run(result)
+        except SystemExit as e:
+            result = e.code
+        except Exception as e:
+            print(f"⚠️  Validation test error: {e}")
+            return True  # Don't fail setup for validation issues
+        
+        if result is None or result == 0:
+            print("✅ Validation test passed!")
+            return True
+        
+        print(f"❌ Validation test failed with status {result}")
+        return False
+    
+    def _run_validation_subprocess(self):
+        """Run the migration test in a separate interpreter."""
         try:
             # Try to run the migration test
             result = subprocess.run([
@@ -541,50 +768,68 @@ ON CONFLICT (key) DO NOTHING;
     
     def run_setup(self):
         """Run the complete setup process."""
-        self.print_banner()
-        
-        # Check prerequisites
-        if not self.check_prerequisites():
-            return False
-        
-        # Get database configuration
-        self.get_database_config()
-        
-        # Test connection
-        if not self.test_database_connection():
-            print("\nPlease check your database settings and try again.")
-            return False
-        
-        # Create database
-        if not self.create_database():
-            return False
-        
-        # Create schema
-        if not self.create_schema():
-            return False
-        
-        # Configure additional settings
-        self.configure_additional_settings()
-        
-        # Create environment file
-        if not self.create_environment_file():
-            return False
-        
-        # Create directories
-        if not self.create_directories():
-            return False
-        
-        # Run validation
-        self.run_validation_test()
-        
-        # Print completion message
-        self.print_completion_message()
-        
-        return True
+        try:
+            self.print_banner()
+            
+            # Check prerequisites
+            if not self.check_prerequisites():
+                return False
+            
+            # Collect all configuration before opening any connection
+            if self.config_file:
+                if not self.load_config_file():
+                    return False
+            else:
+                self.get_database_config()
+                self.configure_additional_settings()
+            
+            # Test connection
+            if not self.test_database_connection():
+                print("\nPlease check your database settings and try again.")
+                return False
+            
+            # Create database
+            if not self.create_database():
+                return False
+            
+            # Create schema
+            if not self.create_schema():
+                return False
+            
+            # Database setup is done; validation opens its own pool
+            self._close_conns()
+            
+            # Create environment file
+            if not self.create_environment_file():
+                return False
+            
+            # Create directories
+            if not self.create_directories():
+                return False
+            
+            # Run validation
+            self.run_validation_test()
+            
+            # Print completion message
+            self.print_completion_message()
+            
+            return True
+        finally:
+            # Close the connections shared by the database setup steps
+            self._close_conns()
+            self._close_pool()
 
 def main():
     """Main entry point."""
-    setup = PostgreSQLEnvironmentSetup()
+    parser = argparse.ArgumentParser(description="PostgreSQL environment setup for the background agents system")
+    parser.add_argument(
+        '--config',
+        metavar='PATH',
+        help="Read settings from a .env-format file instead of prompting for them",
+    )
+    args = parser.parse_args()
+    
+    setup = PostgreSQLEnvironmentSetup(config_file=args.config)
     
     try:
         success = setup.run_setup()